@@ -0,0 +1,143 @@
+"""
+Numba kernels for ball possession detection.
+
+The kernels work on plain arrays only: per-frame ball bboxes/centers and the player bboxes of
+all frames stacked CSR style, where the players of frame ``f`` are
+``player_bboxes[frame_offsets[f]:frame_offsets[f + 1]]``.
+"""
+
+import math
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def best_candidate_kernel(
+    player_bboxes,
+    ball_center,
+    ball_bbox,
+    containment_threshold,
+    possession_threshold,
+):
+    """
+    Find the player closest to the ball in a single frame, using scalar locals only.
+
+    A player containing more than containment_threshold of the ball wins outright (highest
+    ratio first), otherwise the player whose bbox boundary is closest to the ball center wins
+    if it is closer than possession_threshold.
+
+    Args:
+        player_bboxes (np.ndarray): (N, 4) float32 player bboxes of the frame.
+        ball_center (np.ndarray): (2,) float32 ball center.
+        ball_bbox (np.ndarray): (4,) float32 ball bbox.
+        containment_threshold (float): Ball containment ratio that decides possession outright.
+        possession_threshold (float): Maximum ball-to-player distance for possession.
+
+    Returns:
+        int: Row of the best candidate in player_bboxes, -1 if no player is close enough.
+    """
+    bx1, by1, bx2, by2 = ball_bbox
+    ball_center_x, ball_center_y = ball_center
+    ball_area = (bx2 - bx1) * (by2 - by1)
+
+    best_containment = 0.0
+    best_containment_idx = -1
+    best_distance = 0.0
+    best_distance_idx = -1
+    for i in range(player_bboxes.shape[0]):
+        px1, py1, px2, py2 = player_bboxes[i]
+
+        intersection_w = max(0.0, min(px2, bx2) - max(px1, bx1))
+        intersection_h = max(0.0, min(py2, by2) - max(py1, by1))
+        containment = intersection_w * intersection_h / ball_area
+        if best_containment_idx == -1 or containment > best_containment:
+            best_containment = containment
+            best_containment_idx = i
+
+        # distance to the bbox boundary: point-to-rectangle outside, nearest edge inside
+        dx = max(px1 - ball_center_x, 0.0, ball_center_x - px2)
+        dy = max(py1 - ball_center_y, 0.0, ball_center_y - py2)
+        if dx == 0.0 and dy == 0.0:
+            distance = min(
+                ball_center_x - px1,
+                px2 - ball_center_x,
+                ball_center_y - py1,
+                py2 - ball_center_y,
+            )
+        else:
+            distance = math.hypot(dx, dy)
+        if best_distance_idx == -1 or distance < best_distance:
+            best_distance = distance
+            best_distance_idx = i
+
+    if best_containment_idx != -1 and best_containment > containment_threshold:
+        return best_containment_idx
+    if best_distance_idx != -1 and best_distance < possession_threshold:
+        return best_distance_idx
+    return -1
+
+
+@njit(cache=True)
+def detect_possession_kernel(
+    ball_centers,
+    ball_bboxes,
+    ball_valid,
+    player_bboxes,
+    player_ids,
+    frame_offsets,
+    containment_threshold,
+    possession_threshold,
+    min_frames,
+):
+    """
+    Find the player holding the ball in every frame.
+
+    Args:
+        ball_centers (np.ndarray): (F, 2) float32 ball centers.
+        ball_bboxes (np.ndarray): (F, 4) float32 ball bboxes.
+        ball_valid (np.ndarray): (F,) bool, False for frames without a ball detection.
+        player_bboxes (np.ndarray): (P, 4) float32 player bboxes of all frames.
+        player_ids (np.ndarray): (P,) int64 track ids matching player_bboxes.
+        frame_offsets (np.ndarray): (F + 1,) int64 CSR offsets into player_bboxes.
+        containment_threshold (float): Ball containment ratio that decides possession outright.
+        possession_threshold (float): Maximum ball-to-player distance for possession.
+        min_frames (int): Consecutive frames a player needs before possession is confirmed.
+
+    Returns:
+        np.ndarray: (F,) int64 player id in possession per frame, -1 where nobody has it.
+    """
+    num_frames = ball_bboxes.shape[0]
+    possession = np.full(num_frames, -1, dtype=np.int64)
+    current_player_id = -1
+    consecutive_frames = 0
+
+    for frame_num in range(num_frames):
+        if not ball_valid[frame_num]:
+            continue
+
+        start = frame_offsets[frame_num]
+        best_idx = best_candidate_kernel(
+            player_bboxes[start : frame_offsets[frame_num + 1]],
+            ball_centers[frame_num],
+            ball_bboxes[frame_num],
+            containment_threshold,
+            possession_threshold,
+        )
+        player_id = -1 if best_idx == -1 else player_ids[start + best_idx]
+
+        if player_id == -1:
+            current_player_id = -1
+            consecutive_frames = 0
+            continue
+
+        if player_id == current_player_id:
+            consecutive_frames += 1
+        else:
+            current_player_id = player_id
+            consecutive_frames = 1
+
+        if consecutive_frames >= min_frames:
+            possession[frame_num] = player_id
+
+    return possession
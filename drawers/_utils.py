@@ -1,33 +1,31 @@
 """
 A utility module providing functions for drawing shapes on video frames.
 
-This module includes functions to draw triangles and ellipses on frames, which can be used
-to represent various annotations such as player positions or ball locations in sports analysis.
+This module includes functions to draw triangles and text glyphs on frames, which can be used
+to represent various annotations such as player positions or ball locations in sports analysis,
+and the output buffer handling shared by the drawers.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
-import sys
-
-sys.path.append("../")
-from utils import get_center_of_bbox, get_bbox_width
 
 
-def draw_traingle(frame, bbox, color):
+def draw_triangle(frame, x, y, color):
     """
-    Draws a filled triangle on the given frame at the specified bounding box location.
+    Draws a filled triangle pointing down at the given point, e.g. the top center of a bounding box.
 
     Args:
         frame (numpy.ndarray): The frame on which to draw the triangle.
-        bbox (tuple): A tuple representing the bounding box (x, y, width, height).
+        x (int): Horizontal position of the triangle tip.
+        y (int): Vertical position of the triangle tip.
         color (tuple): The color of the triangle in BGR format.
 
     Returns:
         numpy.ndarray: The frame with the triangle drawn on it.
     """
-    y = int(bbox[1])
-    x, _ = get_center_of_bbox(bbox)
-
     triangle_points = np.array(
         [
             [x, y],
@@ -41,87 +39,108 @@ def draw_traingle(frame, bbox, color):
     return frame
 
 
-def draw_ellipse(frame, bbox, color, track_id=None):
+def render_text_glyphs(texts, font_face, font_scale, thickness, color):
     """
-    Draws an ellipse and an optional rectangle with a track ID on the given frame at the specified bounding box location.
+    Pre-renders texts as masks that draw_glyph can stamp into frames.
+
+    cv2.putText rasterizes the glyphs from scratch on every call, for a small fixed set of
+    labels it is cheaper to render them once and copy them in with a mask.
 
     Args:
-        frame (numpy.ndarray): The frame on which to draw the ellipse.
-        bbox (tuple): A tuple representing the bounding box (x, y, width, height).
-        color (tuple): The color of the ellipse in BGR format.
-        track_id (int, optional): The track ID to display inside a rectangle. Defaults to None.
+        texts (list): The texts to render.
+        font_face (int): OpenCV font, e.g. cv2.FONT_HERSHEY_SIMPLEX.
+        font_scale (float): Font scale as passed to cv2.putText.
+        thickness (int): Stroke thickness as passed to cv2.putText.
+        color (tuple): The color of the text in BGR format.
 
     Returns:
-        numpy.ndarray: The frame with the ellipse and optional track ID drawn on it.
+        dict | None: Maps each text to (mask, patch, (offset_x, offset_y)), where the offset
+        is the position of the mask's top-left corner relative to the putText origin. None
+        if this OpenCV build anti-aliases putText, a binary mask can't reproduce that.
     """
-    y2 = int(bbox[3])
-    x_center, _ = get_center_of_bbox(bbox)
-    width = get_bbox_width(bbox)
-
-    cv2.ellipse(
-        frame,
-        center=(x_center, y2),
-        axes=(int(width), int(0.35 * width)),
-        angle=0.0,
-        startAngle=-45,
-        endAngle=235,
-        color=color,
-        thickness=2,
-        lineType=cv2.LINE_4,
-    )
-
-    rectangle_width = 40
-    rectangle_height = 20
-    x1_rect = x_center - rectangle_width // 2
-    x2_rect = x_center + rectangle_width // 2
-    y1_rect = (y2 - rectangle_height // 2) + 15
-    y2_rect = (y2 + rectangle_height // 2) + 15
-
-    if track_id is not None:
-        cv2.rectangle(
-            frame,
-            (int(x1_rect), int(y1_rect)),
-            (int(x2_rect), int(y2_rect)),
-            color,
-            cv2.FILLED,
+    glyphs = {}
+    for text in texts:
+        (text_width, text_height), baseline = cv2.getTextSize(
+            text, font_face, font_scale, thickness
         )
-
-        x1_text = x1_rect + 12
-        if track_id > 99:
-            x1_text -= 10
-
-        cv2.putText(
-            frame,
-            f"{track_id}",
-            (int(x1_text), int(y1_rect + 15)),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.6,
-            (0, 0, 0),
-            2,
+        padding = thickness + 2
+        canvas = np.zeros(
+            (text_height + baseline + 2 * padding, text_width + 2 * padding),
+            dtype=np.uint8,
         )
+        origin = (padding, padding + text_height)
+        cv2.putText(canvas, text, origin, font_face, font_scale, 255, thickness)
+        if np.any((canvas != 0) & (canvas != 255)):
+            return None
+
+        ys, xs = np.nonzero(canvas)
+        y1, y2, x1, x2 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+        mask = canvas[y1:y2, x1:x2]
+        patch = np.full((*mask.shape, 3), color, dtype=np.uint8)
+        glyphs[text] = (mask, patch, (x1 - origin[0], y1 - origin[1]))
+    return glyphs
+
 
+def draw_glyph(frame, glyph, origin):
+    """
+    Stamps a glyph from render_text_glyphs into the frame, like cv2.putText at origin.
+
+    Args:
+        frame (numpy.ndarray): The frame on which to draw the glyph.
+        glyph (tuple): (mask, patch, (offset_x, offset_y)) as returned by render_text_glyphs.
+        origin (tuple): Bottom-left corner of the text, as for cv2.putText.
+
+    Returns:
+        numpy.ndarray: The frame with the glyph drawn on it.
+    """
+    mask, patch, (offset_x, offset_y) = glyph
+    x = origin[0] + offset_x
+    y = origin[1] + offset_y
+    height, width = mask.shape
+
+    # clip the glyph to the frame
+    x1, y1 = max(x, 0), max(y, 0)
+    x2, y2 = min(x + width, frame.shape[1]), min(y + height, frame.shape[0])
+    if x1 >= x2 or y1 >= y2:
+        return frame
+
+    glyph_region = (slice(y1 - y, y2 - y), slice(x1 - x, x2 - x))
+    cv2.copyTo(patch[glyph_region], mask[glyph_region], frame[y1:y2, x1:x2])
     return frame
 
 
-def draw_triangle(frame, bbox, color):
+def get_output_frames(frames, inplace=False):
     """
-    Draws a filled triangle on the given frame at the specified bounding box location.
+    Returns the frames a drawer should draw into.
 
     Args:
-        frame (numpy.ndarray): The frame on which to draw the triangle.
-        bbox (tuple): A tuple representing the bounding box (x, y, width, height).
-        color (tuple): The color of the triangle in BGR format.
+        frames (list | numpy.ndarray): The input video frames.
+        inplace (bool, optional): Draw directly into the input frames. Defaults to False.
+
+    Returns:
+        list | numpy.ndarray: The input frames when inplace, otherwise a single preallocated
+        (num_frames, H, W, 3) copy of them.
     """
-    y = int(bbox[1])
-    x, _ = get_center_of_bbox(bbox)
-    triangle_points = np.array(
-        [
-            [x, y],
-            [x - 10, y - 20],
-            [x + 10, y - 20],
-        ]
-    )
-    cv2.drawContours(frame, [triangle_points], 0, color, cv2.FILLED)
-    cv2.drawContours(frame, [triangle_points], 0, (0, 0, 0), 2)
+    if inplace or len(frames) == 0:
+        return frames
 
-    return frame
+    output_frames = np.empty((len(frames), *frames[0].shape), dtype=frames[0].dtype)
+    for frame_num, frame in enumerate(frames):
+        np.copyto(output_frames[frame_num], frame)
+    return output_frames
+
+
+def draw_frames_in_parallel(draw_frame, num_frames):
+    """
+    Calls draw_frame(frame_num) for every frame on a thread pool.
+
+    Frames are annotated independently and OpenCV releases the GIL while drawing, so this
+    scales with the number of cores. draw_frame must only write to its own frame.
+
+    Args:
+        draw_frame (callable): Draws the annotations of a single frame given its index.
+        num_frames (int): The number of frames to draw.
+    """
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        # consume the iterator so exceptions raised while drawing propagate
+        list(executor.map(draw_frame, range(num_frames)))
@@ -1,21 +1,34 @@
-from drawers._utils import draw_triangle
+from drawers._utils import draw_frames_in_parallel, draw_triangle, get_output_frames
 
 
 class BallTrackDrawers:
     def __init__(self):
         self.ball_color = (0, 255, 0)
 
-    def draw(self, frames, tracks):
-        video_frames = []
-        for frame_num, frame in enumerate(frames):
-            frame = frame.copy()
-            ball_track = tracks[frame_num]
-            frame = self.draw_ball_track(frame, ball_track)
-            video_frames.append(frame)
+    def draw(self, frames, tracks, inplace=False):
+        """
+        Draw the ball tracks on every frame.
+
+        Args:
+            frames (list): The video frames.
+            tracks (list): Ball tracks per frame.
+            inplace (bool, optional): Draw directly into frames instead of a copy. Defaults to False.
+
+        Returns:
+            list | numpy.ndarray: The annotated frames.
+        """
+        video_frames = get_output_frames(frames, inplace)
+
+        def draw_frame(frame_num):
+            self.draw_ball_track(video_frames[frame_num], tracks[frame_num])
+
+        draw_frames_in_parallel(draw_frame, len(video_frames))
         return video_frames
 
     def draw_ball_track(self, frame, ball_tracks):
         for _, ball_track in ball_tracks.items():
-            if ball_track["bbox"] is not None:
-                frame = draw_triangle(frame, ball_track["bbox"], self.ball_color)
+            bbox = ball_track["bbox"]
+            if bbox is not None and len(bbox) != 0:
+                x_center = int((bbox[0] + bbox[2]) / 2)
+                frame = draw_triangle(frame, x_center, int(bbox[1]), self.ball_color)
         return frame
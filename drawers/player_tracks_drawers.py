@@ -1,50 +1,175 @@
-from drawers._utils import draw_ellipse, draw_traingle
+import cv2
+import numpy as np
+
+from drawers._utils import (
+    draw_frames_in_parallel,
+    draw_glyph,
+    draw_triangle,
+    get_output_frames,
+    render_text_glyphs,
+)
+from utils.bbox import get_bbox_widths, get_truncated_centers_of_bboxes
 
 
 class PlayerTracksDrawer:
-    def __init__(self, team_1_color=[255, 245, 238], team_2_color=[128, 0, 0]):
+    def __init__(self, team_1_color=(255, 245, 238), team_2_color=(128, 0, 0)):
         """
         Initialize the PlayerTracksDrawer with specified team colors.
 
         Args:
-            team_1_color (list, optional): RGB color for Team 1. Defaults to [255, 245, 238].
-            team_2_color (list, optional): RGB color for Team 2. Defaults to [128, 0, 0].
+            team_1_color (tuple, optional): BGR color for Team 1 (white). Defaults to (255, 245, 238).
+            team_2_color (tuple, optional): BGR color for Team 2 (dark blue). Defaults to (128, 0, 0).
         """
         self.default_player_team_id = (
             1  # if something goes wrong, we don't get player ID then default to team 1
         )
-        self.team_1_color = team_1_color
-        self.team_2_color = team_2_color
-
-    def draw(self, video_frames, tracks, player_assignment, ball_aquisition):
-        output_frames = []
-        for frame_num, frame in enumerate(video_frames):
-            frame = frame.copy()
-            player_tracks = tracks[frame_num]
-            player_assignment_frame = player_assignment[frame_num]
-            player_id_has_ball = ball_aquisition[frame_num]
-
-            frame = self.draw_player_tracks(
-                frame,
-                player_tracks,
-                player_assignment_frame=player_assignment_frame,
-                player_id_has_ball=player_id_has_ball,
+        # native int tuples are what OpenCV takes as a color without converting per call
+        self.team_1_color = tuple(int(c) for c in team_1_color)
+        self.team_2_color = tuple(int(c) for c in team_2_color)
+        self.team_colors = {1: self.team_1_color, 2: self.team_2_color}
+        self.default_team_color = self.team_colors[self.default_player_team_id]
+
+        # track id labels are drawn for every player in every frame, render the common ones
+        # once (empty when this OpenCV build anti-aliases text, then putText is used)
+        self.track_id_font = (cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+        font_face, font_scale, font_color, font_thickness = self.track_id_font
+        self.track_id_glyphs = (
+            render_text_glyphs(
+                [f"{track_id}" for track_id in range(200)],
+                font_face,
+                font_scale,
+                font_thickness,
+                font_color,
             )
-            output_frames.append(frame)
+            or {}
+        )
+
+    def draw(
+        self,
+        video_frames,
+        player_track_arrays,
+        player_teams,
+        ball_aquisition,
+        inplace=False,
+    ):
+        """
+        Draw the player tracks, team colors and ball holder on every frame.
+
+        Args:
+            video_frames (list): The video frames.
+            player_track_arrays (tuple): (bboxes, track_ids, mask) player track arrays as
+                returned by utils.tracks_to_arrays.
+            player_teams (numpy.ndarray): (num_frames, max_tracks) team id per track slot,
+                0 where no team is known.
+            ball_aquisition (list): Player id in possession of the ball for each frame.
+            inplace (bool, optional): Draw directly into video_frames instead of a copy. Defaults to False.
 
+        Returns:
+            list | numpy.ndarray: The annotated frames.
+        """
+        bboxes, track_ids, mask = player_track_arrays
+        output_frames = get_output_frames(video_frames, inplace)
+
+        def draw_frame(frame_num):
+            frame_mask = mask[frame_num]
+            self.draw_player_tracks(
+                output_frames[frame_num],
+                bboxes[frame_num, frame_mask],
+                track_ids[frame_num, frame_mask],
+                player_teams[frame_num, frame_mask],
+                player_id_has_ball=ball_aquisition[frame_num],
+            )
+
+        draw_frames_in_parallel(draw_frame, len(output_frames))
         return output_frames
 
     def draw_player_tracks(
-        self, frame, player_tracks, player_assignment_frame, player_id_has_ball
+        self, frame, bboxes, track_ids, team_ids, player_id_has_ball
     ):
-        for track_id, track in player_tracks.items():
-            team_id = player_assignment_frame.get(track_id, self.default_player_team_id)
-            if team_id == self.default_player_team_id:
-                color = self.team_1_color
+        """
+        Draw the players of a single frame.
+
+        Args:
+            frame (numpy.ndarray): The frame to draw on.
+            bboxes (numpy.ndarray): (N, 4) bounding boxes of the frame's players.
+            track_ids (numpy.ndarray): (N,) track ids matching bboxes.
+            team_ids (numpy.ndarray): (N,) team ids matching bboxes, 0 where unknown.
+            player_id_has_ball (int | None): Track id of the player holding the ball.
+
+        Returns:
+            numpy.ndarray: The frame with the players drawn on it.
+        """
+        if len(track_ids) == 0:
+            return frame
+
+        # precompute the geometry of every ellipse, id box and label in one go, the loop
+        # below only issues the OpenCV calls
+        rectangle_width = 40
+        rectangle_height = 20
+        x_centers = get_truncated_centers_of_bboxes(bboxes)[:, 0]
+        float_widths = get_bbox_widths(bboxes)
+        widths = float_widths.astype(np.int32)
+        y1s = bboxes[:, 1].astype(np.int32)
+        y2s = bboxes[:, 3].astype(np.int32)
+        minor_axes = (0.35 * float_widths).astype(np.int32)
+        x1_rects = x_centers - rectangle_width // 2
+        x2_rects = x_centers + rectangle_width // 2
+        y1_rects = y2s - rectangle_height // 2 + 15
+        y2_rects = y2s + rectangle_height // 2 + 15
+        x1_texts = x1_rects + 12 - 10 * (track_ids > 99)
+        y1_texts = y1_rects + 15
+
+        for (
+            track_id,
+            team_id,
+            x_center,
+            y1,
+            y2,
+            width,
+            minor_axis,
+            x1_rect,
+            x2_rect,
+            y1_rect,
+            y2_rect,
+            x1_text,
+            y1_text,
+        ) in zip(
+            track_ids.tolist(),
+            team_ids.tolist(),
+            x_centers.tolist(),
+            y1s.tolist(),
+            y2s.tolist(),
+            widths.tolist(),
+            minor_axes.tolist(),
+            x1_rects.tolist(),
+            x2_rects.tolist(),
+            y1_rects.tolist(),
+            y2_rects.tolist(),
+            x1_texts.tolist(),
+            y1_texts.tolist(),
+        ):
+            color = self.team_colors.get(team_id, self.default_team_color)
+            cv2.ellipse(
+                frame,
+                center=(x_center, y2),
+                axes=(width, minor_axis),
+                angle=0.0,
+                startAngle=-45,
+                endAngle=235,
+                color=color,
+                thickness=2,
+                lineType=cv2.LINE_4,
+            )
+            cv2.rectangle(
+                frame, (x1_rect, y1_rect), (x2_rect, y2_rect), color, cv2.FILLED
+            )
+            label = f"{track_id}"
+            glyph = self.track_id_glyphs.get(label)
+            if glyph is not None:
+                draw_glyph(frame, glyph, (x1_text, y1_text))
             else:
-                color = self.team_2_color
-            frame = draw_ellipse(frame, track["bbox"], color, track_id)
+                cv2.putText(frame, label, (x1_text, y1_text), *self.track_id_font)
             if track_id == player_id_has_ball:
-                frame = draw_traingle(frame, track["bbox"], color)
+                frame = draw_triangle(frame, x_center, y1, color)
 
         return frame
@@ -5,6 +5,7 @@ from drawers import PlayerTracksDrawer
 from drawers.ball_track_drawers import BallTrackDrawers
 from team_assigner import TeamAssigner
 from trackers import BallTracker, PlayerTracker
+from utils.tracks import tracks_to_arrays
 from utils.utils import read_video, save_video
 
 
@@ -17,33 +18,35 @@ def main():
     player_tracks = player_tracker.get_object_tracks(
         frames,
         read_from_stub=True,
-        stub_path=Path.cwd() / "stubs" / "player_tracks.pkl",
+        stub_path=Path.cwd() / "stubs" / "player_tracks.npz",
     )
     ball_tracks = ball_tracker.get_object_tracks(
-        frames, read_from_stub=True, stub_path=Path.cwd() / "stubs" / "ball_tracks.pkl"
+        frames, read_from_stub=True, stub_path=Path.cwd() / "stubs" / "ball_tracks.npz"
     )
-    ball_tracks = ball_tracker.remove_wrong_detections(ball_tracks)
-    ball_tracks = ball_tracker.interpolate_ball_position(ball_tracks)
+    # convert once, every consumer below works on the arrays
+    player_track_arrays = tracks_to_arrays(player_tracks)
+    ball_tracks = ball_tracker.clean_and_interpolate_ball_position(ball_tracks)
 
     team_assigner = TeamAssigner()
-    player_assignment = team_assigner.get_player_teams_across_frames(
+    player_teams = team_assigner.get_player_teams_across_frames(
         frames,
-        player_tracks,
+        player_track_arrays,
         read_from_stub=True,
-        stub_path=Path.cwd() / "stubs" / "player_teams.pkl",
+        stub_path=Path.cwd() / "stubs" / "player_teams.npz",
     )
 
     ball_aquisition_detector = BallAquisitionDetector()
     ball_aquisition = ball_aquisition_detector.detect_ball_passession(
-        player_tracks, ball_tracks
+        player_track_arrays, ball_tracks
     )
     print(ball_aquisition)
 
     player_tracks_drawer = PlayerTracksDrawer()
     ball_tracks_drawer = BallTrackDrawers()
-    frames = ball_tracks_drawer.draw(frames, ball_tracks)
+    # frames is rebound to the drawers' output, so they can draw in place
+    frames = ball_tracks_drawer.draw(frames, ball_tracks, inplace=True)
     frames = player_tracks_drawer.draw(
-        frames, player_tracks, player_assignment, ball_tracks
+        frames, player_track_arrays, player_teams, ball_aquisition, inplace=True
     )
 
     save_video(frames, Path.cwd() / "output_videos" / "output.mp4")
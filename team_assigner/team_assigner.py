@@ -1,84 +1,572 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import cv2
-from PIL import Image
+import numpy as np
+import torch
+import torch.nn.functional as F
 
 # Load model directly
 from transformers import AutoModelForZeroShotImageClassification, AutoProcessor
 
+from utils.bbox_utils import calculate_iou_batch
 from utils.stubs import read_stub, save_stub
 
 
+class ImageEncoder(torch.nn.Module):
+    """Wraps a CLIP model's image tower as a plain module for ONNX export."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        return self.model.get_image_features(pixel_values=pixel_values)
+
+
 class TeamAssigner:
     def __init__(
-        self, team_1="white basketball jersey", team_2="dark blue basketball jersey"
+        self,
+        team_1="white basketball jersey",
+        team_2="dark blue basketball jersey",
+        quantize_on_cpu=True,
+        onnx_model_path=None,
     ):
         self.team_1_class_name = team_1
         self.team_2_class_name = team_2
         self.model_id = "patrickjohncyh/fashion-clip"
-        self.player_teams_dict = {}  # cache for player teams
         self.confidence_threshold = 0.6  # Minimum confidence for classification
+        self.batch_window = (
+            50  # frames whose unlabeled player crops are classified together
+        )
+        # crops per CLIP forward pass, bounds activation memory for crowded windows
+        self.clip_batch_size = 64
+        # a new track id overlapping a track of the previous frame that ended this much takes
+        # over its team
+        self.iou_threshold = 0.5
+        # a crop whose 64-bit difference hash is this close (in bits) to a crop already
+        # classified for the same player reuses its team instead of running CLIP
+        self.hash_distance_threshold = 4
+        self.crop_hashes = {}  # player_id -> recent (crop hash, team id) pairs
+        self.max_hashes_per_player = 16
+        # player_id -> [team 1 votes, team 2 votes] of every CLIP result for that player, a
+        # player is labeled with its majority so a single misclassified crop cannot flip it
+        self.player_team_votes = {}
+        self.latest_player_teams = {}  # player_id -> team of the player's latest CLIP result
+        # crops smaller than this carry too little jersey for CLIP, such players keep the team
+        # they had before
+        self.min_crop_side = 24
+        self.min_crop_area = 32 * 32
+        # int8 image tower when no GPU is available
+        self.quantize_on_cpu = quantize_on_cpu
+        # int8 ONNX Runtime image tower, exported on first use (requires onnx + onnxruntime)
+        self.onnx_model_path = onnx_model_path
+        self.session = None
+        self.model = None  # loaded lazily by load_model
 
     def load_model(self):
-        # Pin to a specific revision for security - using main branch
-        self.processor = AutoProcessor.from_pretrained(self.model_id)  # nosec B615
-        self.model = AutoModelForZeroShotImageClassification.from_pretrained(  # nosec B615
-            self.model_id,
+        if self.model is not None:
+            # already loaded, the prompts' text features are cached with it
+            return
+
+        if self.onnx_model_path is not None:
+            # torch only encodes the prompts and exports the image tower, ONNX Runtime takes
+            # numpy input so the crops are preprocessed on the CPU
+            self.device = "cpu"
+            self.dtype = torch.float32
+        elif torch.cuda.is_available():
+            self.device = "cuda"
+            # half precision halves the weight bandwidth; bf16 where supported (Ampere+)
+            self.dtype = (
+                torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            )
+        else:
+            self.device = "cpu"
+            self.dtype = torch.float32
+
+        # the processor and the weights load concurrently, both from the local cache when
+        # they are already downloaded
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            processor = executor.submit(
+                self.load_pretrained, AutoProcessor, use_fast=True
+            )
+            model = executor.submit(
+                self.load_pretrained,
+                AutoModelForZeroShotImageClassification,
+                torch_dtype=self.dtype,
+                low_cpu_mem_usage=True,
+            )
+            self.processor = processor.result()
+            self.model = model.result()
+        self.model = self.model.to(self.device).eval()
+
+        # CPU crops are resized with OpenCV and normalized by hand, (x / 255 - mean) / std
+        # folded into a single multiply-add
+        image_processor = self.processor.image_processor
+        self.image_size = image_processor.crop_size["height"]
+        image_std = torch.tensor(image_processor.image_std).view(1, 3, 1, 1)
+        image_mean = torch.tensor(image_processor.image_mean).view(1, 3, 1, 1)
+        self.pixel_scale = 1 / (255 * image_std)
+        self.pixel_offset = -image_mean / image_std
+
+        if self.onnx_model_path is not None:
+            self.session = self.load_onnx_session()
+        elif self.device == "cpu" and self.quantize_on_cpu:
+            # dynamic int8 quantization of the image tower, the only part on the hot path.
+            # naming the submodules on the parent also swaps the bare visual_projection
+            # Linear, which quantize_dynamic never replaces when it is the root module
+            torch.ao.quantization.quantize_dynamic(
+                self.model,
+                {"vision_model", "visual_projection"},
+                dtype=torch.qint8,
+                inplace=True,
+            )
+
+        # the class prompts never change, encode them once so classification only needs the
+        # image tower and a (B, D) @ (D, 2) product
+        self.classes = [self.team_1_class_name, self.team_2_class_name]
+        text_inputs = self.processor(
+            text=self.classes, return_tensors="pt", padding=True
+        ).to(self.device)
+        with torch.inference_mode():
+            # logit scale folded in, a batch's logits are then a single matmul
+            self.text_features = (
+                F.normalize(self.model.get_text_features(**text_inputs), dim=-1)
+                * self.model.logit_scale.exp()
+            )
+
+    def load_pretrained(self, loader, **kwargs):
+        """
+        Load model_id with a transformers Auto class, skipping the Hub round trip if cached.
+
+        Args:
+            loader (type): The transformers Auto class, e.g. AutoProcessor.
+            **kwargs: Extra from_pretrained arguments.
+
+        Returns:
+            The loaded processor or model.
+        """
+        try:
+            # Pin to a specific revision for security - using main branch
+            return loader.from_pretrained(  # nosec B615
+                self.model_id, local_files_only=True, **kwargs
+            )
+        except OSError:
+            # not downloaded yet
+            return loader.from_pretrained(self.model_id, **kwargs)  # nosec B615
+
+    def load_onnx_session(self):
+        """
+        Open an ONNX Runtime session on the int8 image tower, exporting it first if needed.
+
+        The exported graph maps pixel_values to the (unnormalized) image features, the same
+        output as model.get_image_features.
+
+        Returns:
+            onnxruntime.InferenceSession: Session on onnx_model_path.
+        """
+        import onnxruntime
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        onnx_model_path = Path(self.onnx_model_path)
+        if not onnx_model_path.exists():
+            onnx_model_path.parent.mkdir(parents=True, exist_ok=True)
+            fp32_model_path = onnx_model_path.with_suffix(".fp32.onnx")
+            image_size = self.model.config.vision_config.image_size
+            torch.onnx.export(
+                ImageEncoder(self.model),
+                torch.zeros(1, 3, image_size, image_size),
+                fp32_model_path,
+                input_names=["pixel_values"],
+                output_names=["image_features"],
+                dynamic_axes={
+                    "pixel_values": {0: "batch"},
+                    "image_features": {0: "batch"},
+                },
+                opset_version=17,
+            )
+            quantize_dynamic(
+                fp32_model_path, onnx_model_path, weight_type=QuantType.QInt8
+            )
+            fp32_model_path.unlink()
+
+        return onnxruntime.InferenceSession(
+            onnx_model_path,
+            providers=[
+                provider
+                for provider in ["CUDAExecutionProvider", "CPUExecutionProvider"]
+                if provider in onnxruntime.get_available_providers()
+            ],
         )
 
-    def get_player_color(self, frame, bbox):
-        image = frame[int(bbox[1]) : int(bbox[3]), int(bbox[0]) : int(bbox[2])]
+    def crop_player(self, rgb_frame, bbox):
+        """Crop a player out of an RGB frame as a (H, W, 3) view of the frame."""
+        return rgb_frame[int(bbox[1]) : int(bbox[3]), int(bbox[0]) : int(bbox[2])]
 
-        # Convert to PIL Image
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(rgb_image)
+    def resize_crop(self, image):
+        """
+        Resize a crop's shortest edge to image_size and center crop it to a square, the same
+        geometry as the CLIP image processor.
 
-        # Use more descriptive class names that work better with fashion-clip
-        classes = [self.team_1_class_name, self.team_2_class_name]
-        inputs = self.processor(
-            text=classes, images=pil_image, return_tensors="pt", padding=True
+        Args:
+            image (np.ndarray): (H, W, 3) uint8 RGB crop.
+
+        Returns:
+            np.ndarray: (image_size, image_size, 3) uint8 RGB crop.
+        """
+        height, width = image.shape[:2]
+        size = self.image_size
+        if height < width:
+            resized_height, resized_width = size, int(size * width / height)
+        else:
+            resized_height, resized_width = int(size * height / width), size
+        image = cv2.resize(
+            image, (resized_width, resized_height), interpolation=cv2.INTER_CUBIC
         )
-        outputs = self.model(**inputs)
-        logits = outputs.logits_per_image
-        probs = logits.softmax(dim=1)
-
-        class_name = classes[probs.argmax(dim=1).item()]
-        return class_name
-
-    def get_player_team(self, frame, player_bbox, player_id):
-        if player_id in self.player_teams_dict:
-            return self.player_teams_dict[player_id]
-        player_color = self.get_player_color(frame, player_bbox)
-        # Fixed logic: team 1 for team_1_class_name, team 2 for team_2_class_name
-        team_id = 1 if player_color == self.team_1_class_name else 2
-        player_id_value = player_id.item() if hasattr(player_id, "item") else player_id
-        self.player_teams_dict[player_id_value] = team_id
-        return team_id
+        top = (resized_height - size) // 2
+        left = (resized_width - size) // 2
+        return image[top : top + size, left : left + size]
+
+    def crop_players(self, frame, bboxes):
+        """
+        Convert a BGR frame to RGB once and crop every bbox out of it.
+
+        Args:
+            frame (np.ndarray): BGR video frame.
+            bboxes (np.ndarray): (N, 4) player bboxes.
+
+        Returns:
+            list: On CUDA, (3, H, W) uint8 tensors on the GPU. On the CPU, crops already
+            resized to (image_size, image_size, 3) uint8 arrays.
+        """
+        if self.device == "cuda":
+            # one upload per frame instead of one small copy per crop, the channel flip and
+            # the crops then stay on the GPU for the image processor
+            rgb_frame = torch.from_numpy(frame).to(self.device).flip(-1)
+            return [
+                self.crop_player(rgb_frame, bbox).permute(2, 0, 1) for bbox in bboxes
+            ]
+
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return [self.resize_crop(self.crop_player(rgb_frame, bbox)) for bbox in bboxes]
+
+    @torch.inference_mode()
+    def preprocess_crops(self, player_images):
+        """
+        Normalize player crops into a single pixel batch on the model's device.
+
+        Args:
+            player_images (list): Player crops as returned by crop_players.
+
+        Returns:
+            torch.Tensor: (B, 3, image_size, image_size) pixel values in the model's dtype.
+        """
+        if self.device == "cuda":
+            # the fast image processor resizes and normalizes the whole batch on the GPU
+            image_inputs = self.processor.image_processor(
+                player_images, return_tensors="pt", device=self.device
+            )
+            return image_inputs["pixel_values"].to(
+                self.device, self.dtype, non_blocking=True
+            )
+
+        images = torch.from_numpy(np.stack(player_images)).permute(0, 3, 1, 2)
+        return (images * self.pixel_scale + self.pixel_offset).to(self.dtype)
+
+    def classify_batch(self, pixel_values):
+        """
+        Run the image tower once over a pixel batch and match it against the class prompts.
+
+        Args:
+            pixel_values (torch.Tensor): (B, 3, 224, 224) pixel values from preprocess_crops.
+
+        Returns:
+            list: The class index for every crop.
+        """
+        if self.session is not None:
+            (image_features,) = self.session.run(
+                None, {"pixel_values": pixel_values.numpy()}
+            )
+            image_features = torch.from_numpy(image_features)
+            logits = F.normalize(image_features, dim=-1) @ self.text_features.T
+            return logits.argmax(dim=1).tolist()
+
+        with (
+            torch.inference_mode(),
+            torch.autocast(
+                self.device, dtype=self.dtype, enabled=self.device == "cuda"
+            ),
+        ):
+            image_features = F.normalize(
+                self.model.get_image_features(pixel_values=pixel_values), dim=-1
+            )
+            logits = image_features @ self.text_features.T
+        return logits.argmax(dim=1).tolist()
+
+    def hash_crop(self, frame, bbox):
+        """
+        Compute the 64-bit difference hash of a player's crop.
+
+        The crop is shrunk to 9x8 grayscale pixels and every bit records whether a pixel is
+        brighter than its left neighbour, so small shifts and lighting changes keep the hash
+        within a few bits.
+
+        Args:
+            frame (np.ndarray): BGR video frame.
+            bbox (np.ndarray): (x1, y1, x2, y2) player bbox.
+
+        Returns:
+            int | None: The hash, None for an empty crop.
+        """
+        crop = frame[int(bbox[1]) : int(bbox[3]), int(bbox[0]) : int(bbox[2])]
+        if crop.size == 0:
+            return None
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+        return int.from_bytes(np.packbits(small[:, 1:] > small[:, :-1]).tobytes())
+
+    def find_cached_team(self, player_id, crop_hash):
+        """
+        Look up the team of a crop that looks like one already classified for this player.
+
+        Args:
+            player_id (int): Track id of the player.
+            crop_hash (int | None): Difference hash of the crop, from hash_crop.
+
+        Returns:
+            int: The cached team id, 0 if there is no close enough crop.
+        """
+        if crop_hash is None:
+            return 0
+        for cached_hash, team_id in self.crop_hashes.get(player_id, ()):
+            if (crop_hash ^ cached_hash).bit_count() <= self.hash_distance_threshold:
+                return team_id
+        return 0
+
+    def cache_crop_team(self, player_id, crop_hash, team_id):
+        """Remember the team CLIP assigned to a player's crop, keeping the most recent ones."""
+        if crop_hash is None:
+            return
+        if player_id not in self.crop_hashes:
+            self.crop_hashes[player_id] = deque(maxlen=self.max_hashes_per_player)
+        self.crop_hashes[player_id].append((crop_hash, team_id))
+
+    def vote_player_team(self, player_id, team_id):
+        """
+        Record a CLIP result for a player and return the player's majority team.
+
+        Args:
+            player_id (int): Track id of the player.
+            team_id (int): Team (1 or 2) CLIP assigned to the player's latest crop.
+
+        Returns:
+            int: The team most of the player's crops were assigned to, the latest one on a tie.
+        """
+        votes = self.player_team_votes.setdefault(player_id, [0, 0])
+        votes[team_id - 1] += 1
+        self.latest_player_teams[player_id] = team_id
+        return self.majority_team(player_id, team_id)
+
+    def majority_team(self, player_id, tie_team_id):
+        """Return the team most of the player's crops were assigned to, tie_team_id on a tie."""
+        team_1_votes, team_2_votes = self.player_team_votes[player_id]
+        if team_1_votes == team_2_votes:
+            return tie_team_id
+        return 1 if team_1_votes > team_2_votes else 2
+
+    def get_player_colors(self, player_images):
+        """
+        Classify player crops, clip_batch_size crops per forward pass.
+
+        Args:
+            player_images (list): Player crops as returned by crop_players.
+
+        Returns:
+            list: The matching class name for every crop.
+        """
+        class_ids = []
+        for batch_start in range(0, len(player_images), self.clip_batch_size):
+            pixel_values = self.preprocess_crops(
+                player_images[batch_start : batch_start + self.clip_batch_size]
+            )
+            class_ids.extend(self.classify_batch(pixel_values))
+        return [self.classes[class_id] for class_id in class_ids]
 
     def get_player_teams_across_frames(
-        self, video_frames, player_tracks, read_from_stub=False, stub_path=None
+        self, video_frames, player_track_arrays, read_from_stub=False, stub_path=None
     ):
-        player_assignment = read_stub(read_from_stub, stub_path)
-        if player_assignment is not None:
-            if len(player_assignment) == len(video_frames):
-                return player_assignment
+        """
+        Assign every tracked player of every frame to a team.
+
+        A player whose track id was in the previous frame keeps its team from there, a new
+        track id whose box and a track of the previous frame that ended are each other's best
+        overlap (above iou_threshold) inherits that track's team, a player whose crop hashes
+        close to one already classified for the same track id reuses that team. Everyone else is classified with
+        CLIP, collecting the crops of batch_window frames and running them clip_batch_size
+        crops at a time.
+
+        Args:
+            video_frames (list): The video frames.
+            player_track_arrays (tuple): (bboxes, track_ids, mask) player track arrays as
+                returned by utils.tracks_to_arrays.
+            read_from_stub (bool): Whether to attempt reading cached results.
+            stub_path (str): Path to the .npz cache file.
+
+        Returns:
+            np.ndarray: (num_frames, max_tracks) int8 team id (1 or 2) per track slot, 0 for
+            empty slots.
+        """
+        stub = read_stub(read_from_stub, stub_path)
+        if stub is not None:
+            if len(stub["player_teams"]) == len(video_frames):
+                return stub["player_teams"]
+
+        # track ids are per video, a previous video's hashes and votes must not carry over
+        self.crop_hashes = {}
+        self.player_team_votes = {}
+        self.latest_player_teams = {}
 
         self.load_model()
-        player_assignment = []
-        for frame_num, player_track in enumerate(player_tracks):
-            player_assignment.append({})
-
-            # refresh cache at every 50th frame (model can make mistakes on overlapping detections to avoid that)
-            # improves efficiency and helps with tracking consistency
-            if frame_num % 50 == 0:
-                self.player_teams_dict = {}
-
-            for player_id, track in player_track.items():
-                team = self.get_player_team(
-                    video_frames[frame_num], track["bbox"], player_id
-                )
-                player_id_value = (
-                    player_id.item() if hasattr(player_id, "item") else player_id
+        bboxes, track_ids, mask = player_track_arrays
+        num_frames = len(mask)
+        player_teams = np.zeros(mask.shape, dtype=np.int8)
+        previous_bboxes = np.empty((0, 4), dtype=np.float32)
+        previous_ids = np.empty(0, dtype=track_ids.dtype)
+        # per slot of the previous frame, whether it ends up with a team (once CLIP has run)
+        previous_has_team = np.zeros(0, dtype=np.bool_)
+        for window_start in range(0, num_frames, self.batch_window):
+            window_end = min(window_start + self.batch_window, num_frames)
+
+            # per frame, the previous frame slot each player inherits its team from (-1: ask CLIP)
+            window_matches = []
+            # (frame_num, slot, player_id, crop hash) of every crop, in crop order
+            clip_slots = []
+            crop_bboxes = {}  # frame_num -> bboxes to crop
+            for frame_num in range(window_start, window_end):
+                frame_bboxes = bboxes[frame_num, mask[frame_num]]
+                frame_ids = track_ids[frame_num, mask[frame_num]]
+                # crop what is inside the frame, detections at the edges may stick out
+                frame_height, frame_width = video_frames[frame_num].shape[:2]
+                crop_boxes = np.clip(
+                    frame_bboxes,
+                    0,
+                    [frame_width, frame_height, frame_width, frame_height],
+                ).astype(np.int32)
+                crop_sizes = crop_boxes[:, 2:] - crop_boxes[:, :2]
+                too_small = (crop_sizes.min(axis=1) < self.min_crop_side) | (
+                    crop_sizes.prod(axis=1) < self.min_crop_area
                 )
-                player_assignment[frame_num][player_id_value] = team
 
-        save_stub(stub_path, player_assignment)
-        return player_assignment
+                # propagate the team of the same track id in the previous frame, only players
+                # without a previous slot to inherit from are sent to CLIP
+                matches = np.full(len(frame_bboxes), -1)
+                if len(frame_bboxes) and len(previous_bboxes):
+                    id_order = np.argsort(previous_ids)
+                    id_slots = id_order[
+                        np.searchsorted(previous_ids, frame_ids, sorter=id_order).clip(
+                            max=len(previous_ids) - 1
+                        )
+                    ]
+                    continued = previous_ids[id_slots] == frame_ids
+                    matches[continued] = id_slots[continued]
+
+                    # a new track id takes over from a track that ended where it starts, the
+                    # overlap has to be mutual so two crossing players cannot swap labels
+                    new_slots = np.flatnonzero(~continued)
+                    ended_slots = np.flatnonzero(~np.isin(previous_ids, frame_ids))
+                    if len(new_slots) and len(ended_slots):
+                        ious = calculate_iou_batch(
+                            frame_bboxes[new_slots], previous_bboxes[ended_slots]
+                        )
+                        best_matches = ious.argmax(axis=1)
+                        mutual = ious.argmax(axis=0)[best_matches] == np.arange(
+                            len(new_slots)
+                        )
+                        best_ious = ious[np.arange(len(new_slots)), best_matches]
+                        overlapping = mutual & (best_ious > self.iou_threshold)
+                        matches[new_slots[overlapping]] = ended_slots[
+                            best_matches[overlapping]
+                        ]
+
+                    # only inherit from a labeled slot, an unlabeled one (too small and never
+                    # classified) would pass its 0 on and keep the player away from CLIP
+                    matches = np.where(
+                        (matches != -1) & previous_has_team[matches], matches, -1
+                    )
+                has_team = matches != -1
+
+                # of the rest, players whose crop looks like one already classified for them
+                # reuse that team
+                unclassified = []
+                for slot in np.flatnonzero(matches == -1).tolist():
+                    player_id = int(track_ids[frame_num, slot])
+                    if too_small[slot]:
+                        # left unlabeled (0) if the player was never classified
+                        if player_id in self.player_team_votes:
+                            player_teams[frame_num, slot] = self.majority_team(
+                                player_id, self.latest_player_teams[player_id]
+                            )
+                            has_team[slot] = True
+                        continue
+
+                    crop_hash = self.hash_crop(
+                        video_frames[frame_num], crop_boxes[slot]
+                    )
+                    team_id = self.find_cached_team(player_id, crop_hash)
+                    if team_id:
+                        # no new evidence, keep the player's current majority
+                        player_teams[frame_num, slot] = self.majority_team(
+                            player_id, team_id
+                        )
+                    else:
+                        unclassified.append(slot)
+                        clip_slots.append((frame_num, slot, player_id, crop_hash))
+                    has_team[slot] = True
+                if unclassified:
+                    crop_bboxes[frame_num] = crop_boxes[unclassified]
+                window_matches.append(matches)
+                previous_bboxes = frame_bboxes
+                previous_ids = frame_ids
+                previous_has_team = has_team
+
+            if crop_bboxes:
+                # color conversion and cropping run per frame on a thread pool (OpenCV releases
+                # the GIL), the CLIP forward stays a single batched call per window
+                with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                    frames_crops = executor.map(
+                        lambda frame_num: self.crop_players(
+                            video_frames[frame_num], crop_bboxes[frame_num]
+                        ),
+                        crop_bboxes,
+                    )
+                    crops = [
+                        crop for frame_crops in frames_crops for crop in frame_crops
+                    ]
+                player_colors = self.get_player_colors(crops)
+                for (frame_num, slot, player_id, crop_hash), player_color in zip(
+                    clip_slots, player_colors
+                ):
+                    # Fixed logic: team 1 for team_1_class_name, team 2 for team_2_class_name
+                    team_id = 1 if player_color == self.team_1_class_name else 2
+                    self.cache_crop_team(player_id, crop_hash, team_id)
+                    player_teams[frame_num, slot] = self.vote_player_team(
+                        player_id, team_id
+                    )
+
+            # valid tracks are packed at the start of each row, so slot i is column i
+            for frame_num, matches in enumerate(window_matches, start=window_start):
+                matched = np.flatnonzero(matches != -1)
+                inherited_teams = player_teams[frame_num - 1, matches[matched]]
+                player_teams[frame_num, matched] = inherited_teams
+                # an inherited label still has to agree with the player's own votes
+                for slot, team_id in zip(matched.tolist(), inherited_teams.tolist()):
+                    player_id = int(track_ids[frame_num, slot])
+                    if player_id in self.player_team_votes:
+                        player_teams[frame_num, slot] = self.majority_team(
+                            player_id, team_id
+                        )
+
+        save_stub(stub_path, player_teams=player_teams)
+        return player_teams
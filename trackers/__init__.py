@@ -1,4 +1,10 @@
+import torch
+
 from .ball_tracker import BallTracker
 from .player_tracker import PlayerTracker
 
+# the detectors always see the same letterboxed input shape, let cuDNN pick the fastest
+# convolution algorithms for it once
+torch.backends.cudnn.benchmark = True
+
 __all__ = ["PlayerTracker", "BallTracker"]
@@ -0,0 +1,100 @@
+"""
+Numba kernels for cleaning up the ball trajectory.
+
+The kernels work on a (F, 4) float64 array of per-frame ball bboxes, with NaN rows for frames
+without a detection, and update it in place.
+"""
+
+import math
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def remove_wrong_detections_kernel(ball_bboxes, max_allowed_distance):
+    """
+    Blank out ball detections that jump too far from the last accepted detection.
+
+    A detection is accepted when its top-left corner is within max_allowed_distance per
+    elapsed frame of the last accepted one.
+
+    Args:
+        ball_bboxes (np.ndarray): (F, 4) float64 ball bboxes, NaN rows where there is no ball.
+            Rejected rows are set to NaN.
+        max_allowed_distance (float): Maximum distance the ball may move per frame.
+
+    Returns:
+        np.ndarray: (F,) bool, True for the rows that were rejected.
+    """
+    num_frames = ball_bboxes.shape[0]
+    rejected = np.zeros(num_frames, dtype=np.bool_)
+    last_good_frame = -1
+    last_good_x = 0.0
+    last_good_y = 0.0
+    for frame_num in range(num_frames):
+        x = ball_bboxes[frame_num, 0]
+        y = ball_bboxes[frame_num, 1]
+        if math.isnan(x):
+            continue
+        if last_good_frame != -1:
+            adjusted_max_distance = max_allowed_distance * (frame_num - last_good_frame)
+            if math.hypot(x - last_good_x, y - last_good_y) > adjusted_max_distance:
+                ball_bboxes[frame_num, :] = np.nan
+                rejected[frame_num] = True
+                continue
+        last_good_frame = frame_num
+        last_good_x = x
+        last_good_y = y
+    return rejected
+
+
+@njit(cache=True)
+def interpolate_kernel(ball_bboxes):
+    """
+    Fill the NaN rows of a ball trajectory by linear interpolation.
+
+    Rows before the first or after the last detection take the nearest detected bbox, like
+    np.interp. A trajectory without any detection is left as is.
+
+    Args:
+        ball_bboxes (np.ndarray): (F, 4) float64 ball bboxes, NaN rows where there is no ball.
+            Filled in place.
+    """
+    num_frames = ball_bboxes.shape[0]
+    previous_frame = -1
+    for frame_num in range(num_frames):
+        if math.isnan(ball_bboxes[frame_num, 0]):
+            continue
+        if previous_frame == -1:
+            # leading gap, hold the first detection
+            for gap_frame in range(frame_num):
+                ball_bboxes[gap_frame, :] = ball_bboxes[frame_num, :]
+        elif frame_num - previous_frame > 1:
+            frame_gap = frame_num - previous_frame
+            for column in range(4):
+                start = ball_bboxes[previous_frame, column]
+                slope = (ball_bboxes[frame_num, column] - start) / frame_gap
+                for gap_frame in range(previous_frame + 1, frame_num):
+                    ball_bboxes[gap_frame, column] = (
+                        slope * (gap_frame - previous_frame) + start
+                    )
+        previous_frame = frame_num
+
+    if previous_frame != -1:
+        # trailing gap, hold the last detection
+        for gap_frame in range(previous_frame + 1, num_frames):
+            ball_bboxes[gap_frame, :] = ball_bboxes[previous_frame, :]
+
+
+@njit(cache=True)
+def clean_and_interpolate_kernel(ball_bboxes, max_allowed_distance):
+    """
+    Drop jumping ball detections and interpolate over every gap, in place.
+
+    Args:
+        ball_bboxes (np.ndarray): (F, 4) float64 ball bboxes, NaN rows where there is no ball.
+        max_allowed_distance (float): Maximum distance the ball may move per frame.
+    """
+    remove_wrong_detections_kernel(ball_bboxes, max_allowed_distance)
+    interpolate_kernel(ball_bboxes)
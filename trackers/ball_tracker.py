@@ -1,20 +1,58 @@
-import pandas as pd
-from ultralytics import YOLO
+from collections.abc import Sized
+from itertools import chain, islice
+
+import numpy as np
+import torch
 import supervision as sv
 from utils.stubs import read_stub, save_stub
-import numpy as np
+from utils.tracks import arrays_to_tracks, tracks_to_arrays
+
+from ._kernels import (
+    clean_and_interpolate_kernel,
+    interpolate_kernel,
+    remove_wrong_detections_kernel,
+)
+from .yolo_model import autotune_batch_size, load_yolo
 
 
 class BallTracker:
-    def __init__(self, model_path):
-        self.model = YOLO(model_path)
+    def __init__(self, model_path, tensorrt=False, batch_size=16):
+        self.model = load_yolo(model_path, tensorrt=tensorrt)
+        # frames per predict call, "auto" picks the fastest on the first frame
+        self.batch_size = batch_size
+        # how far (in pixels) the ball may move per frame before a detection is dropped
+        self.max_allowed_distance = 25
+
+    @torch.inference_mode()
+    def detect_frames(self, frames):
+        """
+        Run the detector over frames, batch_size frames per predict call.
+
+        Args:
+            frames (Iterable): Video frames, e.g. a list, a (F, H, W, 3) array or the
+                utils.iter_video generator. They are consumed batch by batch, so a generator
+                is never materialized.
+
+        Returns:
+            list: sv.Detections per frame. Every result is reduced to its boxes, classes and
+                confidences before the next batch is decoded, so the ultralytics results (which
+                keep a reference to their input frame) never pile up.
+        """
+        frames = iter(frames)
+        if self.batch_size == "auto":
+            first_frame = next(frames, None)
+            if first_frame is None:
+                return []
+            self.batch_size = autotune_batch_size(self.model, first_frame)
+            frames = chain([first_frame], frames)
 
-    def detect_frames(self, frames, batch_size=20):
         detections = []
-        for i in range(0, len(frames), batch_size):
-            batch = frames[i : i + batch_size]
-            results = self.model.predict(batch, conf=0.5, iou=0.7)
-            detections.extend(results)
+        while batch := list(islice(frames, self.batch_size)):
+            # stream yields results one by one instead of building the batch's list first
+            results = self.model.predict(batch, conf=0.5, iou=0.7, stream=True)
+            detections.extend(
+                sv.Detections.from_ultralytics(result) for result in results
+            )
         return detections
 
     def get_object_tracks(self, frames, read_from_stub=False, stub_path=None):
@@ -22,80 +60,98 @@ class BallTracker:
         Get player tracking results for a sequence of frames with optional caching.
 
         Args:
-            frames (list): List of video frames to process.
+            frames (Iterable): Video frames to process, see detect_frames.
             read_from_stub (bool): Whether to attempt reading cached results.
-            stub_path (str): Path to the cache file.
+            stub_path (str): Path to the .npz cache file.
 
         Returns:
             list: List of dictionaries containing player tracking information for each frame,
                 where each dictionary maps player IDs to their bounding box coordinates.
         """
-        tracks = read_stub(read_from_stub, stub_path)
-        if tracks is not None:
-            if len(tracks) == len(frames):
-                return tracks
+        stub = read_stub(read_from_stub, stub_path)
+        # the length of a frame generator is unknown, its stub is trusted as is
+        if stub is not None:
+            if not isinstance(frames, Sized) or len(stub["mask"]) == len(frames):
+                return arrays_to_tracks(stub["bboxes"], stub["track_ids"], stub["mask"])
         detections = self.detect_frames(frames)
         tracks = []
-        for frame_num, detection in enumerate(detections):
-            cls_names = detection.names
-            cls_names_inv = {v: k for k, v in cls_names.items()}
-            max_confidence = 0
-            chosen_bbox = None
-
-            # Convert to supervision Detection format
-            detection_supervision = sv.Detections.from_ultralytics(detection)
+        # every result of the model carries the same class names, look the id up once
+        cls_names_inv = {v: k for k, v in self.model.names.items()}
+        ball_cls_id = cls_names_inv["Ball"]
+        for frame_num, detection_supervision in enumerate(detections):
             tracks.append({})
-            for frame_detection in detection_supervision:
-                bbox = frame_detection[0].tolist()
-                cls_id = frame_detection[3]
-                confidence = frame_detection[2]
-                # track_id = frame_detection[4]
-                if cls_id == cls_names_inv["Ball"]:
-                    if max_confidence < confidence:
-                        chosen_bbox = bbox
-                        max_confidence = confidence
-
-            if chosen_bbox is not None:
+            # keep the most confident ball, straight from the detection arrays
+            ball_mask = detection_supervision.class_id == ball_cls_id
+            if ball_mask.any():
+                best_ball = np.argmax(detection_supervision.confidence[ball_mask])
+                chosen_bbox = detection_supervision.xyxy[ball_mask][best_ball].tolist()
                 tracks[frame_num][1] = {"bbox": chosen_bbox}
 
-        save_stub(stub_path, tracks)
+        bboxes, track_ids, mask = tracks_to_arrays(tracks)
+        save_stub(stub_path, bboxes=bboxes, track_ids=track_ids, mask=mask)
         return tracks
 
+    def ball_tracks_to_array(self, ball_position):
+        """
+        Convert per-frame ball tracks into a (num_frames, 4) float64 array, NaN rows where
+        there is no ball.
+        """
+        num_frames = len(ball_position)
+        missing_bbox = [np.nan] * 4
+        return np.array(
+            [
+                ball_track.get(1, {}).get("bbox", []) or missing_bbox
+                for ball_track in ball_position
+            ],
+            dtype=np.float64,
+        ).reshape(num_frames, 4)
+
     def remove_wrong_detections(self, ball_position):
-        MAX_ALLOWED_DISTANCE = 25
-        LAST_GOOD_DETECTION_FRAM_IDX = -1
-        for i in range(len(ball_position)):
-            current_bbox = ball_position[i].get(1, {}).get("bbox", [])
-            if len(current_bbox) == 0:
-                continue
-            if LAST_GOOD_DETECTION_FRAM_IDX == -1:
-                LAST_GOOD_DETECTION_FRAM_IDX = i
-                continue
-
-            last_good_bbox = (
-                ball_position[LAST_GOOD_DETECTION_FRAM_IDX].get(1, {}).get("bbox", [])
-            )
-            frame_gap = i - LAST_GOOD_DETECTION_FRAM_IDX
-            adjusted_max_distance = MAX_ALLOWED_DISTANCE * frame_gap
-
-            norm_distance = (
-                np.linalg.norm(
-                    np.array(current_bbox[:2]) - np.array(last_good_bbox[:2])
-                )
-                > adjusted_max_distance
-            )
-            if norm_distance:
-                ball_position[i][1]["bbox"] = []
-            else:
-                LAST_GOOD_DETECTION_FRAM_IDX = i
+        """
+        Drop ball detections that jump too far from the last accepted detection.
 
+        Args:
+            ball_position (list): Ball tracks per frame, as returned by get_object_tracks.
+                Rejected bboxes are set to [] in place.
+
+        Returns:
+            list: The same ball tracks.
+        """
+        ball_bboxes = self.ball_tracks_to_array(ball_position)
+        rejected = remove_wrong_detections_kernel(
+            ball_bboxes, self.max_allowed_distance
+        )
+        for frame_num in np.flatnonzero(rejected).tolist():
+            ball_position[frame_num][1]["bbox"] = []
         return ball_position
 
     def interpolate_ball_position(self, ball_position):
-        ball_position = [x.get(1, {}).get("bbox", []) for x in ball_position]
-        df_ball_position = pd.DataFrame(ball_position, columns=["x1", "y1", "x2", "y2"])
-        df_ball_position = df_ball_position.interpolate(method="linear")
-        df_ball_position = df_ball_position.bfill()
+        """
+        Fill in the ball bbox of frames without a detection by linear interpolation.
 
-        ball_position = [{1: {"bbox": x}} for x in df_ball_position.to_numpy().tolist()]
-        return ball_position
+        Frames before the first or after the last detection take the nearest detected bbox.
+
+        Args:
+            ball_position (list): Ball tracks per frame, as returned by get_object_tracks.
+
+        Returns:
+            list: Ball tracks per frame with a bbox in every frame.
+        """
+        ball_bboxes = self.ball_tracks_to_array(ball_position)
+        interpolate_kernel(ball_bboxes)
+        return [{1: {"bbox": bbox}} for bbox in ball_bboxes.tolist()]
+
+    def clean_and_interpolate_ball_position(self, ball_position):
+        """
+        remove_wrong_detections followed by interpolate_ball_position, converting the tracks
+        to an array once and leaving ball_position untouched.
+
+        Args:
+            ball_position (list): Ball tracks per frame, as returned by get_object_tracks.
+
+        Returns:
+            list: Ball tracks per frame with a bbox in every frame.
+        """
+        ball_bboxes = self.ball_tracks_to_array(ball_position)
+        clean_and_interpolate_kernel(ball_bboxes, self.max_allowed_distance)
+        return [{1: {"bbox": bbox}} for bbox in ball_bboxes.tolist()]
@@ -1,20 +1,52 @@
-from ultralytics import YOLO
+from collections.abc import Sized
+from itertools import chain, islice
+
+import torch
 import supervision as sv
 
 from utils.stubs import read_stub, save_stub
+from utils.tracks import arrays_to_tracks, tracks_to_arrays
+
+from .yolo_model import autotune_batch_size, load_yolo
 
 
 class PlayerTracker:
-    def __init__(self, model_path):
-        self.model = YOLO(model_path)
+    def __init__(self, model_path, tensorrt=False, batch_size=16):
+        self.model = load_yolo(model_path, tensorrt=tensorrt)
+        # frames per predict call, "auto" picks the fastest on the first frame
+        self.batch_size = batch_size
         self.tracker = sv.ByteTrack()
 
-    def detect_frames(self, frames, batch_size=20):
+    @torch.inference_mode()
+    def detect_frames(self, frames):
+        """
+        Run the detector over frames, batch_size frames per predict call.
+
+        Args:
+            frames (Iterable): Video frames, e.g. a list, a (F, H, W, 3) array or the
+                utils.iter_video generator. They are consumed batch by batch, so a generator
+                is never materialized.
+
+        Returns:
+            list: sv.Detections per frame. Every result is reduced to its boxes, classes and
+                confidences before the next batch is decoded, so the ultralytics results (which
+                keep a reference to their input frame) never pile up.
+        """
+        frames = iter(frames)
+        if self.batch_size == "auto":
+            first_frame = next(frames, None)
+            if first_frame is None:
+                return []
+            self.batch_size = autotune_batch_size(self.model, first_frame)
+            frames = chain([first_frame], frames)
+
         detections = []
-        for i in range(0, len(frames), batch_size):
-            batch = frames[i : i + batch_size]
-            results = self.model.predict(batch, conf=0.5, iou=0.7)
-            detections.extend(results)
+        while batch := list(islice(frames, self.batch_size)):
+            # stream yields results one by one instead of building the batch's list first
+            results = self.model.predict(batch, conf=0.5, iou=0.7, stream=True)
+            detections.extend(
+                sv.Detections.from_ultralytics(result) for result in results
+            )
         return detections
 
     def get_object_tracks(self, frames, read_from_stub=False, stub_path=None):
@@ -22,44 +54,44 @@ class PlayerTracker:
         Get player tracking results for a sequence of frames with optional caching.
 
         Args:
-            frames (list): List of video frames to process.
+            frames (Iterable): Video frames to process, see detect_frames.
             read_from_stub (bool): Whether to attempt reading cached results.
-            stub_path (str): Path to the cache file.
+            stub_path (str): Path to the .npz cache file.
 
         Returns:
             list: List of dictionaries containing player tracking information for each frame,
                 where each dictionary maps player IDs to their bounding box coordinates.
         """
-        tracks = read_stub(read_from_stub, stub_path)
-        if tracks is not None:
-            if len(tracks) == len(frames):
-                return tracks
+        stub = read_stub(read_from_stub, stub_path)
+        # the length of a frame generator is unknown, its stub is trusted as is
+        if stub is not None:
+            if not isinstance(frames, Sized) or len(stub["mask"]) == len(frames):
+                return arrays_to_tracks(stub["bboxes"], stub["track_ids"], stub["mask"])
 
         detections = self.detect_frames(frames)
 
         tracks = []
+        # every result of the model carries the same class names, look the id up once
+        cls_names_inv = {v: k for k, v in self.model.names.items()}
+        player_cls_id = cls_names_inv["Player"]
 
-        for frame_num, detection in enumerate(detections):
-            cls_names = detection.names
-            cls_names_inv = {v: k for k, v in cls_names.items()}
-
-            # Convert to supervision Detection format
-            detection_supervision = sv.Detections.from_ultralytics(detection)
-
+        for detection_supervision in detections:
             # Track Objects
             detection_with_tracks = self.tracker.update_with_detections(
                 detection_supervision
             )
 
-            tracks.append({})
-
-            for frame_detection in detection_with_tracks:
-                bbox = frame_detection[0].tolist()
-                cls_id = frame_detection[3]
-                track_id = frame_detection[4]
-
-                if cls_id == cls_names_inv["Player"]:
-                    tracks[frame_num][track_id] = {"bbox": bbox}
+            player_mask = detection_with_tracks.class_id == player_cls_id
+            tracks.append(
+                {
+                    track_id: {"bbox": bbox}
+                    for track_id, bbox in zip(
+                        detection_with_tracks.tracker_id[player_mask].tolist(),
+                        detection_with_tracks.xyxy[player_mask].tolist(),
+                    )
+                }
+            )
 
-        save_stub(stub_path, tracks)
+        bboxes, track_ids, mask = tracks_to_arrays(tracks)
+        save_stub(stub_path, bboxes=bboxes, track_ids=track_ids, mask=mask)
         return tracks
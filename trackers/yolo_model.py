@@ -0,0 +1,63 @@
+import timeit
+from pathlib import Path
+
+from ultralytics import YOLO
+
+
+def load_yolo(model_path, tensorrt=False, max_batch_size=32):
+    """
+    Load YOLO weights, optionally as a TensorRT FP16 engine.
+
+    The engine is exported once next to the weights (same name, .engine suffix) and reused on
+    later runs. Exporting needs a CUDA GPU and the tensorrt package.
+
+    Args:
+        model_path (str): Path to the .pt weights.
+        tensorrt (bool): Whether to run the model as a TensorRT engine.
+        max_batch_size (int): Largest batch the engine accepts.
+
+    Returns:
+        YOLO: The loaded model.
+    """
+    if not tensorrt:
+        return YOLO(model_path)
+
+    engine_path = Path(model_path).with_suffix(".engine")
+    if not engine_path.exists():
+        YOLO(model_path).export(
+            format="engine",
+            imgsz=640,
+            half=True,
+            dynamic=True,
+            batch=max_batch_size,
+            workspace=4,
+        )
+    return YOLO(engine_path, task="detect")
+
+
+def autotune_batch_size(model, sample_frame, candidates=(1, 4, 8, 16, 32), runs=3):
+    """
+    Pick the batch size with the lowest per-frame detection latency.
+
+    Every candidate is run once to warm up and then timed over a few runs on copies of a
+    sample frame.
+
+    Args:
+        model (YOLO): The loaded model.
+        sample_frame (np.ndarray): A representative video frame.
+        candidates (tuple): Batch sizes to try.
+        runs (int): Timed runs per candidate, the fastest one counts.
+
+    Returns:
+        int: The fastest batch size.
+    """
+    per_frame_latencies = {}
+    for batch_size in candidates:
+        batch = [sample_frame] * batch_size
+        model.predict(batch, verbose=False)
+        latency = min(
+            timeit.timeit(lambda: model.predict(batch, verbose=False), number=1)
+            for _ in range(runs)
+        )
+        per_frame_latencies[batch_size] = latency / batch_size
+    return min(per_frame_latencies, key=per_frame_latencies.get)
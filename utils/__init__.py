@@ -1,13 +1,25 @@
 from .stubs import read_stub, save_stub
-from .utils import read_video, save_video
-from .bbox import get_center_of_bbox, get_bbox_width, get_foot_position
+from .utils import iter_video, read_video, save_video
+from .bbox import (
+    get_bbox_width,
+    get_bbox_widths,
+    get_center_of_bbox,
+    get_foot_position,
+    get_truncated_centers_of_bboxes,
+)
+from .tracks import arrays_to_tracks, tracks_to_arrays
 
 __all__ = [
     "read_stub",
     "save_stub",
+    "iter_video",
     "read_video",
     "save_video",
     "get_center_of_bbox",
     "get_bbox_width",
     "get_foot_position",
+    "get_truncated_centers_of_bboxes",
+    "get_bbox_widths",
+    "tracks_to_arrays",
+    "arrays_to_tracks",
 ]
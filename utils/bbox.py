@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def get_center_of_bbox(bbox):
     """
     Calculate the center coordinates of a bounding box.
@@ -37,3 +40,31 @@ def get_foot_position(bbox):
     """
     x1, y1, x2, y2 = bbox
     return int((x1 + x2) / 2), int(y2)
+
+
+def get_truncated_centers_of_bboxes(bboxes):
+    """
+    Calculate the center coordinates of a stack of bounding boxes, truncated to ints.
+
+    Args:
+        bboxes (np.ndarray): (N, 4) bounding boxes in format (x1, y1, x2, y2).
+
+    Returns:
+        np.ndarray: (N, 2) int32 center coordinates (x, y), truncated like get_center_of_bbox.
+    """
+    bboxes = np.asarray(bboxes)
+    return ((bboxes[..., :2] + bboxes[..., 2:]) / 2).astype(np.int32)
+
+
+def get_bbox_widths(bboxes):
+    """
+    Calculate the widths of a stack of bounding boxes.
+
+    Args:
+        bboxes (np.ndarray): (N, 4) bounding boxes in format (x1, y1, x2, y2).
+
+    Returns:
+        np.ndarray: (N,) widths of the bounding boxes.
+    """
+    bboxes = np.asarray(bboxes)
+    return bboxes[..., 2] - bboxes[..., 0]
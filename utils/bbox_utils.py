@@ -9,8 +9,11 @@ Author: AI Assistant
 Purpose: Educational reference for bbox operations in computer vision
 """
 
+import math
 from typing import Optional, Tuple
 
+import numpy as np
+
 
 def validate_bbox(bbox: Tuple[float, float, float, float]) -> bool:
     """
@@ -197,6 +200,60 @@ def calculate_iou(
     return intersection_area / union_area if union_area > 0 else 0.0
 
 
+def get_bbox_centers(bboxes: np.ndarray) -> np.ndarray:
+    """
+    Get the center points of a stack of bounding boxes.
+
+    Args:
+        bboxes: (N, 4) array of (x1, y1, x2, y2) boxes
+
+    Returns:
+        (N, 2) float array of (center_x, center_y), not truncated
+
+    Example:
+        >>> get_bbox_centers(np.array([(10, 20, 50, 80)], dtype=np.float32))
+        array([[30., 50.]], dtype=float32)
+    """
+    bboxes = np.asarray(bboxes)
+    return (bboxes[..., :2] + bboxes[..., 2:]) / 2
+
+
+def calculate_iou_batch(bboxes1: np.ndarray, bboxes2: np.ndarray) -> np.ndarray:
+    """
+    Calculate the pairwise IoU between two stacks of bounding boxes.
+
+    Args:
+        bboxes1: (N, 4) array of (x1, y1, x2, y2) boxes
+        bboxes2: (M, 4) array of (x1, y1, x2, y2) boxes
+
+    Returns:
+        (N, M) array where entry [i, j] is the IoU of bboxes1[i] and bboxes2[j]
+
+    Example:
+        >>> calculate_iou_batch(np.array([(10, 10, 50, 50)]), np.array([(30, 30, 70, 70)]))
+        array([[0.14285714]])
+    """
+    bboxes1 = np.asarray(bboxes1, dtype=np.float64).reshape(-1, 4)
+    bboxes2 = np.asarray(bboxes2, dtype=np.float64).reshape(-1, 4)
+
+    # (N, 1, 2) against (1, M, 2) broadcasts to every pair
+    top_left = np.maximum(bboxes1[:, None, :2], bboxes2[None, :, :2])
+    bottom_right = np.minimum(bboxes1[:, None, 2:], bboxes2[None, :, 2:])
+    intersection_sides = np.clip(bottom_right - top_left, 0, None)
+    intersection_area = intersection_sides[..., 0] * intersection_sides[..., 1]
+
+    area1 = (bboxes1[:, 2] - bboxes1[:, 0]) * (bboxes1[:, 3] - bboxes1[:, 1])
+    area2 = (bboxes2[:, 2] - bboxes2[:, 0]) * (bboxes2[:, 3] - bboxes2[:, 1])
+    union_area = area1[:, None] + area2[None, :] - intersection_area
+
+    return np.divide(
+        intersection_area,
+        union_area,
+        out=np.zeros_like(intersection_area),
+        where=union_area > 0,
+    )
+
+
 def expand_bbox(
     bbox: Tuple[float, float, float, float], factor: float = 1.2
 ) -> Tuple[float, float, float, float]:
@@ -316,8 +373,40 @@ def visualize_bbox_info(
 def measure_distance_between_points(
     point1: Tuple[float, float], point2: Tuple[float, float]
 ) -> float:
-    return ((point1[0] - point2[0]) ** 2 + (point1[1] - point2[1]) ** 2) ** 0.5
-    # return np.linalg.norm(np.array(point1) - np.array(point2))
+    """
+    Measure the Euclidean distance between two points.
+
+    Args:
+        point1: (x, y) tuple
+        point2: (x, y) tuple
+
+    Returns:
+        Distance as float
+
+    Example:
+        >>> measure_distance_between_points((0, 0), (3, 4))
+        5.0
+    """
+    return math.hypot(point1[0] - point2[0], point1[1] - point2[1])
+
+
+def measure_distances_batch(points1: np.ndarray, points2: np.ndarray) -> np.ndarray:
+    """
+    Measure the Euclidean distances between two stacks of points, pair by pair.
+
+    Args:
+        points1: (N, 2) array of (x, y) points
+        points2: (N, 2) array of (x, y) points, or a single point broadcast against points1
+
+    Returns:
+        (N,) array of distances
+
+    Example:
+        >>> measure_distances_batch(np.array([(0, 0), (1, 1)]), np.array([(3, 4), (4, 5)]))
+        array([5., 5.])
+    """
+    differences = np.asarray(points1) - np.asarray(points2)
+    return np.hypot(differences[..., 0], differences[..., 1])
 
 
 # Example usage and testing
@@ -1,18 +1,88 @@
+import struct
+import zipfile
 from pathlib import Path
-import pickle  # nosec B403 - Used for caching internal tracking data
+
+import numpy as np
 
 
 def read_stub(read_from_stub: bool, stub_path: str):
+    """
+    Read cached arrays saved with save_stub.
+
+    Args:
+        read_from_stub (bool): Whether to attempt reading cached results.
+        stub_path (str): Path to the .npz cache file.
+
+    Returns:
+        dict | None: The cached arrays by name, memory-mapped read-only, None if there is
+            nothing to read.
+    """
     stub_path = Path(stub_path)
     if read_from_stub:
         if stub_path.exists():
-            with stub_path.open("rb") as f:
-                return pickle.load(f)  # nosec B301 - Loading cached internal tracking data
+            return load_npz_memmap(stub_path)
     return None
 
 
-def save_stub(stub_path: str, data: dict):
+def load_npz_memmap(npz_path):
+    """
+    Memory-map the arrays of an uncompressed .npz file instead of reading them.
+
+    np.savez stores every array as a plain .npy member, so each one can be mapped at its
+    offset in the archive and is only paged in when it is used.
+
+    Args:
+        npz_path (str): Path to the .npz file.
+
+    Returns:
+        dict: Read-only arrays by name.
+    """
+    arrays = {}
+    with zipfile.ZipFile(npz_path) as archive, open(npz_path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename.removesuffix(".npy")
+            if info.compress_type != zipfile.ZIP_STORED:
+                # compressed member (np.savez_compressed), it has to be inflated
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+
+            # skip the member's local header (30 bytes + file name + extra field)
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", f.read(4))
+            f.seek(name_length + extra_length, 1)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError(f"{npz_path}: {name} holds Python objects")
+
+            if np.prod(shape) == 0:
+                # an empty file region cannot be mapped
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(
+                    npz_path,
+                    dtype=dtype,
+                    mode="r",
+                    offset=f.tell(),
+                    shape=shape,
+                    order="F" if fortran_order else "C",
+                )
+    return arrays
+
+
+def save_stub(stub_path: str, **arrays: np.ndarray):
+    """
+    Cache arrays in a single uncompressed .npz file.
+
+    Args:
+        stub_path (str): Path to the .npz cache file.
+        **arrays: The arrays to save, by name.
+    """
     stub_path = Path(stub_path)
     stub_path.parent.mkdir(parents=True, exist_ok=True)
     with stub_path.open("wb") as f:
-        pickle.dump(data, f)
+        np.savez(f, **arrays)
@@ -0,0 +1,70 @@
+import numpy as np
+
+
+def tracks_to_arrays(tracks):
+    """
+    Convert per-frame track dictionaries into padded parallel arrays.
+
+    Converting once up front lets every consumer slice arrays instead of walking
+    dictionaries of lists frame by frame.
+
+    Args:
+        tracks (list): A list of dictionaries for each frame, where each dictionary maps
+            track_id to track information including 'bbox'.
+
+    Returns:
+        tuple: (bboxes, track_ids, mask) where
+            bboxes (np.ndarray): (num_frames, max_tracks, 4) float32 bounding boxes.
+            track_ids (np.ndarray): (num_frames, max_tracks) int32 track ids.
+            mask (np.ndarray): (num_frames, max_tracks) bool, True for real tracks. The
+                valid entries of every frame are packed at the start of the row.
+    """
+    num_frames = len(tracks)
+    max_tracks = max((len(frame_tracks) for frame_tracks in tracks), default=0)
+
+    bboxes = np.zeros((num_frames, max_tracks, 4), dtype=np.float32)
+    track_ids = np.zeros((num_frames, max_tracks), dtype=np.int32)
+    mask = np.zeros((num_frames, max_tracks), dtype=np.bool_)
+    for frame_num, frame_tracks in enumerate(tracks):
+        valid_tracks = [
+            (track_id, track["bbox"])
+            for track_id, track in frame_tracks.items()
+            if len(track.get("bbox", [])) != 0
+        ]
+        num_tracks = len(valid_tracks)
+        if num_tracks == 0:
+            continue
+        # coerce ids (python or numpy ints) to plain ints once here so consumers never have to
+        track_ids[frame_num, :num_tracks] = np.fromiter(
+            (int(track_id) for track_id, _ in valid_tracks),
+            dtype=np.int32,
+            count=num_tracks,
+        )
+        bboxes[frame_num, :num_tracks] = [bbox for _, bbox in valid_tracks]
+        mask[frame_num, :num_tracks] = True
+
+    return bboxes, track_ids, mask
+
+
+def arrays_to_tracks(bboxes, track_ids, mask):
+    """
+    Convert padded track arrays from tracks_to_arrays back into per-frame track dictionaries.
+
+    Args:
+        bboxes (np.ndarray): (num_frames, max_tracks, 4) bounding boxes.
+        track_ids (np.ndarray): (num_frames, max_tracks) track ids.
+        mask (np.ndarray): (num_frames, max_tracks) bool, True for real tracks.
+
+    Returns:
+        list: A list of dictionaries for each frame, where each dictionary maps track_id
+            to track information including 'bbox'.
+    """
+    return [
+        {
+            track_id: {"bbox": bbox}
+            for track_id, bbox in zip(
+                frame_ids[frame_mask].tolist(), frame_bboxes[frame_mask].tolist()
+            )
+        }
+        for frame_bboxes, frame_ids, frame_mask in zip(bboxes, track_ids, mask)
+    ]
@@ -1,32 +1,177 @@
-import cv2
+import tempfile
 from pathlib import Path
 
+import cv2
+import numpy as np
+
+try:
+    import av
+except ImportError:  # PyAV is optional, OpenCV decodes and encodes otherwise
+    av = None
+
+# frame counts above this (about 12 hours at 30 fps) are taken as a broken container header
+MAX_FRAME_COUNT = 1_300_000
+
+# PyAV frame rotation (counterclockwise quarter turns of the display matrix) -> the cv2.rotate
+# code that shows the frame upright, as OpenCV's own decoder does
+AV_ROTATE_CODES = {
+    1: cv2.ROTATE_90_COUNTERCLOCKWISE,
+    2: cv2.ROTATE_180,
+    3: cv2.ROTATE_90_CLOCKWISE,
+}
 
-def read_video(video_path):
+
+def iter_video(video_path):
     """
-    Read all frames from a video file into memory.
+    Decode a video file frame by frame.
+
+    Only the current frame is held in memory, so detection can run over arbitrarily long
+    videos in constant memory. Frames are rotated upright according to the video's rotation
+    metadata, with PyAV as with OpenCV.
+
+    Args:
+        video_path (str): Path to the input video file.
+
+    Yields:
+        np.ndarray: The next (height, width, 3) uint8 BGR frame.
+    """
+    if av is not None:
+        # PyAV decodes on all cores (frame and slice threading), OpenCV on one
+        with av.open(str(video_path)) as container:
+            stream = container.streams.video[0]
+            stream.thread_type = "AUTO"
+            for frame in container.decode(stream):
+                image = frame.to_ndarray(format="bgr24")
+                rotate_code = AV_ROTATE_CODES.get(round(frame.rotation / 90) % 4)
+                yield image if rotate_code is None else cv2.rotate(image, rotate_code)
+        return
+
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+def read_video(video_path, cache_path=None):
+    """
+    Read all frames from a video file into one contiguous memory-mapped array.
+
+    The frames are decoded straight into a (num_frames, height, width, 3) uint8 np.memmap,
+    so long videos are paged in and out by the OS instead of living in RAM as a list of
+    separate arrays.
 
     Args:
         video_path (str): Path to the input video file.
+        cache_path (str, optional): File backing the memmap. Defaults to an anonymous
+            temporary file that is removed when the array is released.
 
     Returns:
-        list: List of video frames as numpy arrays.
+        np.memmap: The video frames, shape (num_frames, height, width, 3), dtype uint8.
     """
-    cap = cv2.VideoCapture(video_path)
-    frames = []
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frames.append(frame)
-    return frames
+    cap = cv2.VideoCapture(str(video_path))
+    frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    # the container's frame count is only an estimate, and garbage for raw streams without
+    # one (OpenCV reports a huge negative number), so it only sizes the first allocation
+    capacity = int(frame_count) if 0 < frame_count < MAX_FRAME_COUNT else 256
+
+    if av is not None:
+        cap.release()
+        decoded_frames = iter_video(video_path)
+
+    def decode_next(out):
+        """Decode the next frame, into out when OpenCV can, None at the end."""
+        if av is not None:
+            return next(decoded_frames, None)
+        ret, frame = cap.read() if out is None else cap.read(out)
+        return frame if ret else None
+
+    # the frame shape comes from the first decoded frame, the reported width and height may
+    # or may not have the rotation metadata applied
+    frame = decode_next(None)
+    if frame is None:
+        cap.release()
+        return np.empty((0, height, width, 3), dtype=np.uint8)
+
+    backing_file = (
+        tempfile.TemporaryFile() if cache_path is None else open(cache_path, "w+b")
+    )
+    with backing_file:
+        frames = np.memmap(
+            backing_file, dtype=np.uint8, mode="w+", shape=(capacity, *frame.shape)
+        )
+        frame_num = 0
+        while frame is not None:
+            if frame_num == len(frames):
+                # past the estimate, extend the backing file and map it again
+                frames.flush()
+                frames = np.memmap(
+                    backing_file,
+                    dtype=np.uint8,
+                    mode="r+",
+                    shape=(2 * len(frames), *frames.shape[1:]),
+                )
+            if not np.shares_memory(frame, frames):
+                frames[frame_num] = frame
+            frame_num += 1
+            # decode straight into the next slot, OpenCV only allocates if the shape differs
+            frame = decode_next(frames[frame_num] if frame_num < len(frames) else None)
+    cap.release()
+    # only keep what was actually decoded
+    return frames[:frame_num]
+
+
+# PyAV encoders, fastest first: NVIDIA and Apple hardware, then x264 in software
+AV_ENCODERS = [
+    ("h264_nvenc", {"preset": "p1", "tune": "ll"}),
+    ("h264_videotoolbox", {"realtime": "1"}),
+    ("libx264", {"preset": "veryfast"}),
+]
+
+
+def open_av_writer(output_video_path, width, height, fps):
+    """
+    Open a PyAV container with the first H.264 encoder of AV_ENCODERS that works here.
+
+    Args:
+        output_video_path (str): Path where the video should be saved.
+        width (int): Frame width.
+        height (int): Frame height.
+        fps (float): Frame rate.
+
+    Returns:
+        tuple | None: (container, stream), None if no encoder could be opened.
+    """
+    for codec_name, options in AV_ENCODERS:
+        if codec_name not in av.codecs_available:
+            continue
+        container = av.open(str(output_video_path), mode="w")
+        try:
+            stream = container.add_stream(codec_name, rate=fps, options=options)
+            stream.width = width
+            stream.height = height
+            stream.pix_fmt = "yuv420p"
+            # compiled-in hardware encoders fail here when the device is missing
+            stream.codec_context.open()
+        except av.error.FFmpegError:
+            container.close()
+            continue
+        return container, stream
+    return None
 
 
 def save_video(ouput_video_frames, output_video_path):
     """
     Save a sequence of frames as a video file.
 
-    Creates necessary directories if they don't exist and writes frames using XVID codec.
+    Creates necessary directories if they don't exist. Frames are encoded to H.264 with PyAV
+    when it is installed (hardware encoders first), otherwise with OpenCV's mp4v/XVID.
 
     Args:
         ouput_video_frames (list): List of frames to save.
@@ -35,6 +180,20 @@ def save_video(ouput_video_frames, output_video_path):
     # If folder doesn't exist, create it
     output_path = Path(output_video_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    height, width = ouput_video_frames[0].shape[:2]
+
+    av_writer = None
+    if av is not None:
+        av_writer = open_av_writer(output_path, width, height, 24)
+    if av_writer is not None:
+        container, stream = av_writer
+        with container:
+            for frame in ouput_video_frames:
+                video_frame = av.VideoFrame.from_ndarray(frame, format="bgr24")
+                container.mux(stream.encode(video_frame))
+            # flush the frames the encoder still buffers
+            container.mux(stream.encode())
+        return
 
     # Use appropriate codec based on file extension
     if output_path.suffix.lower() == ".mp4":
@@ -46,7 +205,7 @@ def save_video(ouput_video_frames, output_video_path):
         output_video_path,
         fourcc,
         24.0,
-        (ouput_video_frames[0].shape[1], ouput_video_frames[0].shape[0]),
+        (width, height),
     )
     for frame in ouput_video_frames:
         out.write(frame)